@@ -4,59 +4,336 @@
 MODIS HDF to GeoTIFF converter with Sinusoidal projection support
 """
 
+import dbm
+import errno
+import glob
+import importlib
+import logging
+import multiprocessing
 import os
+import pickle
+import re
+import shelve
 import sys
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date
+from functools import lru_cache
 
 try:
     from tqdm import tqdm
 except ImportError:
     tqdm = None
 
+try:
+    import fcntl
+except ImportError:
+    # Windows locks the analysis cache with msvcrt instead
+    fcntl = None
+    import msvcrt
+
 from pyhdf.SD import SD, SDC
-from osgeo import gdal, osr
+from osgeo import gdal, gdal_array, osr
+
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for MODIS filename and StructMetadata.0 parsing
+_UL_RE = re.compile(r'UpperLeftPointMtrs=\(([^,]+),([^)]+)\)')
+_LR_RE = re.compile(r'LowerRightMtrs=\(([^,]+),([^)]+)\)')
+_XDIM_RE = re.compile(r'XDim=(\d+)')
+_YDIM_RE = re.compile(r'YDim=(\d+)')
+_TILE_RE = re.compile(r'h\d+v\d+')
+_MODIS_DATE_RE = re.compile(r'[^.]*\.A(\d{4})(\d{3})(?:\.|$)')
+_GRID_RE = re.compile(r'GROUP=GRID_\d+(.*?)END_GROUP=GRID_\d+', re.S)
+_GRID_NAME_RE = re.compile(r'GridName="([^"]+)"')
+_DATA_FIELD_RE = re.compile(r'DataFieldName="([^"]+)"')
+
+# Characters replaced with '_' when building output filenames from dataset names
+_SAFE_TBL = str.maketrans({' ': '_', '/': '_', '\\': '_'})
+
+# HDF4 SDS type codes to NumPy dtype names
+_SDC_DTYPES = {
+    SDC.CHAR8: 'S1',
+    SDC.UCHAR8: 'uint8',
+    SDC.INT8: 'int8',
+    SDC.UINT8: 'uint8',
+    SDC.INT16: 'int16',
+    SDC.UINT16: 'uint16',
+    SDC.INT32: 'int32',
+    SDC.UINT32: 'uint32',
+    SDC.FLOAT32: 'float32',
+    SDC.FLOAT64: 'float64'
+}
+
+# SDS attribute names that hold the no data value
+_FILL_VALUE_KEYS = ('_FillValue', '_fillvalue', 'fill_value')
 
+# Array attributes longer than this are not copied into GeoTIFF metadata
+_MAX_METADATA_ITEMS = 8
 
+# Tiled, compressed GeoTIFF layout for converted datasets
+# 512x512 Int16 blocks are ~0.5 MB, small enough to stay cache friendly
+_GTIFF_CREATION_OPTIONS = [
+    'TILED=YES',
+    'BLOCKXSIZE=512',
+    'BLOCKYSIZE=512',
+    'COMPRESS=DEFLATE',
+    'PREDICTOR=2',
+    'ZLEVEL=6',
+    'NUM_THREADS=ALL_CPUS',
+    'BIGTIFF=IF_SAFER'
+]
+
+# Rows read from an SDS per write, matching BLOCKYSIZE above
+_STRIP_ROWS = 512
+
+# ProcessPoolExecutor refuses more workers than this on Windows
+_MAX_WINDOWS_WORKERS = 61
+
+
+def _build_sinu_srs():
+    """
+    Build the standard MODIS Sinusoidal spatial reference
+    
+    Returns:
+        osr.SpatialReference: Sinusoidal projection on the MODIS sphere
+    """
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt('PROJCS["unnamed",GEOGCS["Unknown datum based upon the custom spheroid",DATUM["Not specified (based on custom spheroid)",SPHEROID["Custom spheroid",6371007.181,0]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]]],PROJECTION["Sinusoidal"],PARAMETER["longitude_of_center",0],PARAMETER["false_easting",0],PARAMETER["false_northing",0],UNIT["metre",1,AUTHORITY["EPSG","9001"]],AXIS["Easting",EAST],AXIS["Northing",NORTH]]')
+    return srs
+
+
+# Sinusoidal WKT parsed once and shared by every converted dataset
+_MODIS_SINU_WKT = _build_sinu_srs().ExportToWkt()
+
+# GeoTIFF and HDF4 drivers looked up once instead of per converted file
+gdal.AllRegister()
+_GTIFF_DRIVER = gdal.GetDriverByName('GTiff')
+_HDF4_DRIVER = gdal.GetDriverByName('HDF4')
+
+
+@lru_cache(maxsize=4096)
 def parse_modis_date(filename):
     """
     Parse date from MODIS filename and convert to YYYYMMDD format
     """
+    # Date part follows the product type (e.g., MOD13Q1.A2015209.)
+    match = _MODIS_DATE_RE.match(filename)
+    if not match:
+        return None
+    
+    # Convert year and day of year to a calendar date
+    year, doy = int(match.group(1)), int(match.group(2))
     try:
-        # Split filename by dots
-        parts = filename.split('.')
-        if len(parts) < 2:
-            return None
+        return date.fromordinal(date(year, 1, 1).toordinal() + doy - 1).strftime('%Y%m%d')
+    except ValueError as e:
+        logger.warning("Error parsing date: %s", e)
+        return None
+
+
+@contextmanager
+def _open_hdf(hdf_file):
+    """
+    Open an HDF file once and parse its StructMetadata.0
+    
+    Args:
+        hdf_file (str): Path to MODIS HDF file
         
-        # Get date part (e.g., A2015209)
-        date_part = parts[1]
-        if len(date_part) != 8 or not date_part[0] == 'A':
-            return None
+    Yields:
+        tuple: (SD, global attributes, parsed projection info or None)
+    """
+    hdf_ds = SD(hdf_file, SDC.READ)
+    try:
+        global_attrs = hdf_ds.attributes()
+        projection_info = _parse_struct_metadata(global_attrs.get('StructMetadata.0', ''))
+        yield hdf_ds, global_attrs, projection_info
+    finally:
+        hdf_ds.end()
+
+
+def _user_cache_dir():
+    """
+    Get the per-user cache directory for this converter
+    
+    Returns:
+        str: Cache directory path (not created here)
+    """
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else None
+    base = base or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'hdf2gtiff')
+
+
+# Persistent analyze_hdf_file results, reused across runs over the same tiles
+_ANALYZE_CACHE = os.path.join(_user_cache_dir(), 'analyze')
+_ANALYZE_CACHE_LOCK = _ANALYZE_CACHE + '.lock'
+
+# Bump when the analyze_hdf_file result fields change so older entries are ignored
+_ANALYZE_CACHE_VERSION = 2
+
+
+def _cache_corrupt_errors():
+    """
+    Collect the exceptions that mean the analysis cache database is damaged
+    
+    dbm.error also lists OSError, which covers transient failures such as a full
+    disk, so only dbm's own error and the backend errors are included. dbm.dumb
+    reports a damaged index through ast.literal_eval as SyntaxError or ValueError.
+    
+    Returns:
+        tuple: Exception classes that trigger a cache rebuild
+    """
+    errors = [dbm.error[0], pickle.UnpicklingError, SyntaxError, ValueError]
+    for backend in ('dbm.gnu', 'dbm.ndbm'):
+        try:
+            errors.append(importlib.import_module(backend).error)
+        except ImportError:
+            pass
+    return tuple(errors)
+
+
+_CACHE_CORRUPT_ERRORS = _cache_corrupt_errors()
+
+
+def _analysis_cache_key(hdf_file, stat):
+    """
+    Build the analysis cache key and validator for an HDF file
+    
+    Args:
+        hdf_file (str): Path to MODIS HDF file
+        stat (os.stat_result): Stat of the HDF file
         
-        # Extract year and day of year
-        year = int(date_part[1:5])
-        doy = int(date_part[5:8])
+    Returns:
+        tuple: (absolute path, (cache version, mtime in ns, size in bytes))
+    """
+    return os.path.abspath(hdf_file), (_ANALYZE_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+@contextmanager
+def _analysis_cache_lock():
+    """
+    Hold an OS lock on the analysis cache lock file so only one process writes at a time
+    
+    The OS releases the lock when its holder exits, so a crashed writer never leaves
+    a stale lock behind and the lock file itself is never removed.
+    
+    Yields:
+        bool: True if the lock was acquired, False if another process holds it
+    """
+    with open(_ANALYZE_CACHE_LOCK, 'a+b') as lock_file:
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            # Another process is writing, skip this update rather than wait
+            yield False
+            return
         
-        # Convert to datetime
-        date = datetime(year, 1, 1) + timedelta(days=doy-1)
+        try:
+            yield True
+        finally:
+            # Closing the file releases an flock, Windows byte locks are released explicitly
+            if fcntl is None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_cached_analysis(key, entry):
+    """
+    Write one entry to the analysis cache, rebuilding the database if it is corrupt
+    
+    Args:
+        key (str): Cache key
+        entry (tuple): (validator, file information)
+    """
+    try:
+        with shelve.open(_ANALYZE_CACHE) as cache:
+            cache[key] = entry
+    except _CACHE_CORRUPT_ERRORS as e:
+        # A damaged database cannot be repaired, start a new one
+        logger.debug("Rebuilding analysis cache: %s", e)
+        for path in glob.glob(glob.escape(_ANALYZE_CACHE) + '*'):
+            if path != _ANALYZE_CACHE_LOCK:
+                os.remove(path)
+        with shelve.open(_ANALYZE_CACHE) as cache:
+            cache[key] = entry
+
+
+def _load_cached_analysis(hdf_file, stat):
+    """
+    Load a previous analyze_hdf_file result if the file has not changed since
+    
+    Args:
+        hdf_file (str): Path to MODIS HDF file
+        stat (os.stat_result): Current stat of the HDF file
         
-        # Return YYYYMMDD format
-        return date.strftime('%Y%m%d')
-    except Exception as e:
-        print(f"Error parsing date: {str(e)}")
+    Returns:
+        dict: Cached file information, or None on a cache miss
+    """
+    try:
+        key, validator = _analysis_cache_key(hdf_file, stat)
+        with shelve.open(_ANALYZE_CACHE, flag='r') as cache:
+            entry = cache.get(key)
+    except Exception:
+        return None
+    
+    if not isinstance(entry, tuple) or len(entry) != 2 or entry[0] != validator:
         return None
+    
+    # Report the path as given by this caller, the cache is keyed on the absolute path
+    file_info = entry[1]
+    file_info['path'] = hdf_file
+    logger.debug("Using cached analysis for %s", file_info['basename'])
+    return file_info
 
 
-def analyze_hdf_file(hdf_file):
+def _store_cached_analysis(hdf_file, file_info, stat):
+    """
+    Store an analyze_hdf_file result keyed on the file path, mtime and size
+    
+    Args:
+        hdf_file (str): Path to MODIS HDF file
+        file_info (dict): File information to cache
+        stat (os.stat_result): Stat of the HDF file taken before it was analyzed
+    """
+    try:
+        key, validator = _analysis_cache_key(hdf_file, stat)
+        os.makedirs(os.path.dirname(_ANALYZE_CACHE), exist_ok=True)
+        with _analysis_cache_lock() as locked:
+            if locked:
+                _write_cached_analysis(key, (validator, file_info))
+    except Exception as e:
+        # The cache is only an optimization, never fail the analysis for it
+        logger.debug("Could not update analysis cache: %s", e)
+
+
+def analyze_hdf_file(hdf_file, use_cache=True):
     """
     Analyze HDF file information
     
     Args:
         hdf_file (str): Path to MODIS HDF file
+        use_cache (bool): Reuse and store results in the on-disk analysis cache,
+            invalidated when the file's mtime or size changes (default: True)
         
     Returns:
         dict: File information including resolution, data info, and data fields
+        
+    Raises:
+        FileNotFoundError: If the HDF file does not exist
+        OSError: If the HDF file cannot be accessed
     """
+    # One stat serves the existence check, the cache validator and the file size
+    stat = os.stat(hdf_file)
+    
+    if use_cache:
+        file_info = _load_cached_analysis(hdf_file, stat)
+        if file_info is not None:
+            return file_info
+    
     file_info = {
         'path': hdf_file,
         'basename': os.path.basename(hdf_file),
@@ -65,72 +342,63 @@ def analyze_hdf_file(hdf_file):
         'data_fields': [],
         'date': parse_modis_date(os.path.basename(hdf_file)),
         'product_type': os.path.basename(hdf_file).split('.')[0],
-        'tile': None
+        'tile': None,
+        'projection_info': None
     }
     
     try:
-        # Open HDF file
-        hdf_ds = SD(hdf_file, SDC.READ)
-        
-        # Get global attributes
-        global_attrs = hdf_ds.attributes()
-        
-        # Get tile information from filename
-        import re
-        tile_match = re.search(r'h\d+v\d+', file_info['basename'])
-        if tile_match:
-            file_info['tile'] = tile_match.group(0)
-        
-        # Calculate resolution from StructMetadata.0
-        struct_metadata = global_attrs.get('StructMetadata.0', '')
-        upper_left_match = re.search(r'UpperLeftPointMtrs=\(([^,]+),([^)]+)\)', struct_metadata)
-        lower_right_match = re.search(r'LowerRightMtrs=\(([^,]+),([^)]+)\)', struct_metadata)
-        xdim_match = re.search(r'XDim=(\d+)', struct_metadata)
-        
-        if upper_left_match and lower_right_match and xdim_match:
-            ul_x = float(upper_left_match.group(1))
-            lr_x = float(lower_right_match.group(1))
-            xdim = int(xdim_match.group(1))
+        # Open HDF file and parse StructMetadata.0
+        with _open_hdf(hdf_file) as (hdf_ds, global_attrs, projection_info):
+            # Get tile information from filename
+            tile_match = _TILE_RE.search(file_info['basename'])
+            if tile_match:
+                file_info['tile'] = tile_match.group(0)
             
-            resolution_meters = abs((lr_x - ul_x) / xdim)
-            file_info['resolution'] = f'{resolution_meters:.2f}m'
-            file_info['resolution_meters'] = resolution_meters
-        else:
-            file_info['resolution'] = 'unknown'
-        
-        # Get data fields
-        datasets = hdf_ds.datasets().keys()
-        for dataset_name in datasets:
-            try:
-                dataset = hdf_ds.select(dataset_name)
-                data = dataset.get()
-                attrs = dataset.attributes()
-                
-                field_info = {
-                    'name': dataset_name,
-                    'shape': data.shape,
-                    'dtype': str(data.dtype),
-                    'size': data.size,
-                    'min': np.min(data) if data.size > 0 else None,
-                    'max': np.max(data) if data.size > 0 else None
-                }
-                
-                file_info['data_fields'].append(field_info)
-                dataset = None
-            except Exception as e:
-                print(f"Error analyzing dataset {dataset_name}: {e}")
-                continue
-        
-        file_info['data_info']['total_datasets'] = len(datasets)
-        file_info['data_info']['file_size'] = os.path.getsize(hdf_file) / (1024 * 1024)  # MB
-        
-        # Clean up
-        hdf_ds.end()
+            # Calculate resolution from StructMetadata.0
+            file_info['projection_info'] = projection_info
+            
+            if projection_info:
+                resolution_meters = projection_info['resolution']
+                file_info['resolution'] = f'{resolution_meters:.2f}m'
+                file_info['resolution_meters'] = resolution_meters
+            else:
+                file_info['resolution'] = 'unknown'
+            
+            # Get data fields
+            datasets = hdf_ds.datasets()
+            for dataset_name, (_, dims, data_type, _) in datasets.items():
+                try:
+                    # Shape and type come from the SDS directory, no data is read
+                    shape = tuple(dims)
+                    
+                    # Only the valid_range attribute is read from the SDS
+                    dataset = hdf_ds.select(dataset_name)
+                    valid_range_attr = dataset.findattr('valid_range')
+                    valid_range = valid_range_attr.get() if valid_range_attr is not None else None
+                    
+                    field_info = {
+                        'name': dataset_name,
+                        'shape': shape,
+                        'dtype': _SDC_DTYPES.get(data_type, str(data_type)),
+                        'size': int(np.prod(shape)),
+                        'valid_range': valid_range
+                    }
+                    
+                    file_info['data_fields'].append(field_info)
+                    dataset.endaccess()
+                except Exception as e:
+                    logger.warning("Error analyzing dataset %s: %s", dataset_name, e)
+                    continue
+            
+            file_info['data_info']['total_datasets'] = len(datasets)
+            file_info['data_info']['file_size'] = stat.st_size / (1024 * 1024)  # MB
         
     except Exception as e:
-        print(f"Error analyzing HDF file: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error analyzing HDF file: %s", e)
+    
+    # Only cache complete analyses so failed reads are retried next run
+    if use_cache and file_info['data_fields']:
+        _store_cached_analysis(hdf_file, file_info, stat)
     
     return file_info
 
@@ -151,10 +419,18 @@ def compare_hdf_files(hdf_files):
     # Analyze all files
     file_infos = []
     for hdf_file in hdf_files:
-        print(f"Analyzing file: {os.path.basename(hdf_file)}")
-        file_info = analyze_hdf_file(hdf_file)
+        logger.debug("Analyzing file: %s", os.path.basename(hdf_file))
+        try:
+            file_info = analyze_hdf_file(hdf_file)
+        except OSError as e:
+            # Leave missing or unreadable files out of the comparison, the rest of the batch continues
+            logger.error("Cannot access HDF file %s: %s", hdf_file, e)
+            continue
         file_infos.append(file_info)
     
+    if not file_infos:
+        return {}
+    
     # Compare resolutions
     resolutions = set(info['resolution'] for info in file_infos)
     
@@ -271,115 +547,154 @@ def get_user_selection(file_infos, all_same=True):
         return {'all_same': False, 'selections': selections}
 
 
-def get_modis_projection_info(hdf_file):
+def _parse_struct_metadata(struct_metadata):
+    """
+    Parse georeferencing information from a MODIS StructMetadata.0 string
+    
+    Args:
+        struct_metadata (str): Content of the StructMetadata.0 global attribute
+        
+    Returns:
+        dict: Corner coordinates, dimensions, resolution, geotransform and WKT,
+            or None if the required fields are missing
+    """
+    upper_left_match = _UL_RE.search(struct_metadata)
+    lower_right_match = _LR_RE.search(struct_metadata)
+    xdim_match = _XDIM_RE.search(struct_metadata)
+    ydim_match = _YDIM_RE.search(struct_metadata)
+    
+    if not (upper_left_match and lower_right_match and xdim_match and ydim_match):
+        return None
+    
+    ul_x = float(upper_left_match.group(1))
+    ul_y = float(upper_left_match.group(2))
+    lr_x = float(lower_right_match.group(1))
+    lr_y = float(lower_right_match.group(2))
+    xdim = int(xdim_match.group(1))
+    ydim = int(ydim_match.group(1))
+    
+    # Calculate resolution from actual geographic bounds
+    resolution = abs((lr_x - ul_x) / xdim)
+    
+    return {
+        'ul_x': ul_x,
+        'ul_y': ul_y,
+        'lr_x': lr_x,
+        'lr_y': lr_y,
+        'xdim': xdim,
+        'ydim': ydim,
+        'resolution': resolution,
+        # Create geotransform directly from metadata
+        'geotransform': (ul_x, resolution, 0.0, ul_y, 0.0, -resolution),
+        'projection_wkt': _MODIS_SINU_WKT
+    }
+
+
+def get_modis_projection_info(hdf_file, hdf=None):
     """
     Get projection information from MODIS HDF file
     
     Args:
         hdf_file (str): Path to MODIS HDF file
+        hdf (tuple, optional): (SD, global attributes, parsed projection info) from an
+            already opened _open_hdf. If None, the file is opened here
         
     Returns:
         dict: Projection information including geotransform and WKT
     """
-    import re
-    
     try:
-        from pyhdf.SD import SD, SDC
-        from pyhdf.HDF import HDF
-        from pyhdf.VS import VS
-        
-        projection_info = {
-            'geotransform': None,
-            'projection_wkt': None,
-            'resolution': None
-        }
-        
-        # Open HDF file
-        hdf_ds = SD(hdf_file, SDC.READ)
-        
-        # Get projection info from global attributes
-        global_attrs = hdf_ds.attributes()
-        print("Global attributes:", list(global_attrs.keys()))
+        if hdf is None:
+            with _open_hdf(hdf_file) as hdf:
+                return get_modis_projection_info(hdf_file, hdf)
         
-        # Parse StructMetadata.0 to extract projection info
-        struct_metadata = global_attrs.get('StructMetadata.0', '')
+        # Projection info was parsed from StructMetadata.0 when the file was opened
+        _, global_attrs, projection_info = hdf
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Global attributes: %s", list(global_attrs.keys()))
         
-        # Extract coordinates and dimensions from metadata
-        upper_left_match = re.search(r'UpperLeftPointMtrs=\(([^,]+),([^)]+)\)', struct_metadata)
-        lower_right_match = re.search(r'LowerRightMtrs=\(([^,]+),([^)]+)\)', struct_metadata)
-        xdim_match = re.search(r'XDim=(\d+)', struct_metadata)
-        ydim_match = re.search(r'YDim=(\d+)', struct_metadata)
-        
-        if upper_left_match and lower_right_match and xdim_match and ydim_match:
-            ul_x = float(upper_left_match.group(1))
-            ul_y = float(upper_left_match.group(2))
-            lr_x = float(lower_right_match.group(1))
-            lr_y = float(lower_right_match.group(2))
-            xdim = int(xdim_match.group(1))
-            ydim = int(ydim_match.group(1))
-            
-            # Calculate resolution from actual geographic bounds
-            resolution_x = (lr_x - ul_x) / xdim
-            resolution_y = (lr_y - ul_y) / ydim
-            resolution = abs(resolution_x)
-            
-            print(f"Extracted from StructMetadata.0:")
-            print(f"  UpperLeft: ({ul_x}, {ul_y})")
-            print(f"  LowerRight: ({lr_x}, {lr_y})")
-            print(f"  Dimensions: {xdim} x {ydim}")
-            print(f"  Resolution: {resolution} meters")
-            
-            projection_info['resolution'] = resolution
-            
-            # Create geotransform directly from metadata
-            geotransform = (ul_x, resolution, 0.0, ul_y, 0.0, -resolution)
-            projection_info['geotransform'] = geotransform
-            print(f"Calculated geotransform: {geotransform}")
+        if projection_info:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Extracted from StructMetadata.0:")
+                logger.debug("  UpperLeft: (%s, %s)", projection_info['ul_x'], projection_info['ul_y'])
+                logger.debug("  LowerRight: (%s, %s)", projection_info['lr_x'], projection_info['lr_y'])
+                logger.debug("  Dimensions: %s x %s", projection_info['xdim'], projection_info['ydim'])
+                logger.debug("  Resolution: %s meters", projection_info['resolution'])
+                logger.debug("Calculated geotransform: %s", projection_info['geotransform'])
         else:
             # StructMetadata.0 is required for correct projection
-            print("Error: Could not extract projection info from StructMetadata.0")
-            print("  Missing required metadata for georeferencing")
-            hdf_ds.end()
+            logger.error("Could not extract projection info from StructMetadata.0: "
+                         "missing required metadata for georeferencing")
             return None
         
-        # Set standard Sinusoidal projection WKT
-        srs = osr.SpatialReference()
-        srs.ImportFromWkt('PROJCS["unnamed",GEOGCS["Unknown datum based upon the custom spheroid",DATUM["Not specified (based on custom spheroid)",SPHEROID["Custom spheroid",6371007.181,0]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]]],PROJECTION["Sinusoidal"],PARAMETER["longitude_of_center",0],PARAMETER["false_easting",0],PARAMETER["false_northing",0],UNIT["metre",1,AUTHORITY["EPSG","9001"]],AXIS["Easting",EAST],AXIS["Northing",NORTH]]')
-        projection_info['projection_wkt'] = srs.ExportToWkt()
-        
-        hdf_ds.end()
         return projection_info
         
     except Exception as e:
-        print(f"Error reading projection info: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error reading projection info: %s", e)
         
         return None
 
 
-def hdf_to_geotiff_sinusoidal(hdf_file, output_dir=None, datasets=None):
+def _get_eos_subdatasets(hdf_file, struct_metadata):
+    """
+    Map SDS names to GDAL HDF4-EOS subdataset names
+    
+    Names are built from the grids listed in StructMetadata.0, so the HDF file
+    is not opened through GDAL just to list its subdatasets.
+    
+    Args:
+        hdf_file (str): Path to MODIS HDF file
+        struct_metadata (str): Content of the StructMetadata.0 global attribute
+        
+    Returns:
+        dict: Subdataset name by SDS name, empty if GDAL has no HDF4 driver
+    """
+    if _HDF4_DRIVER is None:
+        return {}
+    
+    subdatasets = {}
+    for grid in _GRID_RE.finditer(struct_metadata):
+        grid_match = _GRID_NAME_RE.search(grid.group(1))
+        if not grid_match:
+            continue
+        for field_name in _DATA_FIELD_RE.findall(grid.group(1)):
+            # e.g. HDF4_EOS:EOS_GRID:"file.hdf":MODIS_Grid_16DAY_250m_500m_VI:250m 16 days NDVI
+            subdatasets[field_name] = f'HDF4_EOS:EOS_GRID:"{hdf_file}":{grid_match.group(1)}:{field_name}'
+    return subdatasets
+
+
+def hdf_to_geotiff_sinusoidal(hdf_file, output_dir=None, datasets=None, projection_info=None):
     """
     Convert MODIS HDF file to GeoTIFF format with Sinusoidal projection
     
     Args:
         hdf_file (str): Path to MODIS HDF file
         output_dir (str, optional): Output directory for GeoTIFF files
-        datasets (list, optional): List of datasets to process. If None, process all NDVI-related datasets
+        datasets (list or str, optional): List of datasets to process, or a single dataset name.
+            If None, process all NDVI-related datasets
+        projection_info (dict, optional): Projection info already parsed by analyze_hdf_file.
+            If None, it is read from the HDF file
         
     Returns:
         list: List of created GeoTIFF files
+        
+    Raises:
+        FileNotFoundError: If the HDF file does not exist
     """
-    if not os.path.exists(hdf_file):
-        print(f"Error: HDF file not found: {hdf_file}")
-        return []
+    if not os.path.isfile(hdf_file):
+        raise FileNotFoundError(errno.ENOENT, "HDF file not found", hdf_file)
+    
+    # Set lookup for the selected dataset names, a single name may be passed as a string
+    if isinstance(datasets, str):
+        datasets = [datasets]
+    wanted = frozenset(datasets) if datasets is not None else None
     
     # Set output directory
     if output_dir is None:
         output_dir = os.path.dirname(hdf_file)
     
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    # Create output directory if it doesn't exist, '' is the current directory
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
     # Get HDF file basename
     hdf_basename = os.path.basename(hdf_file)
@@ -388,151 +703,174 @@ def hdf_to_geotiff_sinusoidal(hdf_file, output_dir=None, datasets=None):
     # Parse date from filename
     date_str = parse_modis_date(hdf_basename)
     if date_str:
-        print(f"Parsed date: {date_str}")
+        logger.debug("Parsed date: %s", date_str)
     else:
-        print("Warning: Could not parse date from filename")
+        logger.warning("Could not parse date from filename: %s", hdf_basename)
+    
+    # Tile goes into output names so tiles of the same product and date do not collide
+    tile_match = _TILE_RE.search(hdf_basename)
+    tile_part = f"_{tile_match.group(0)}" if tile_match else ''
     
     try:
-        # Get projection information from HDF file
-        print(f"Reading projection info from {hdf_basename}")
-        projection_info = get_modis_projection_info(hdf_file)
-        
         # Open HDF file with pyhdf
-        print(f"Using pyhdf to read {hdf_basename}")
-        hdf_ds = SD(hdf_file, SDC.READ)
-        
-        # Get list of datasets
-        all_datasets = hdf_ds.datasets().keys()
-        print(f"Found {len(all_datasets)} datasets in {hdf_basename}")
-        
-        # Determine which datasets to process
-        if datasets is None:
-            # Default: process only NDVI datasets
-            process_datasets = [ds for ds in all_datasets if 'NDVI' in ds]
-        else:
-            # Process user-selected datasets
-            process_datasets = [ds for ds in all_datasets if ds in datasets]
-        
-        print(f"Processing {len(process_datasets)} datasets: {process_datasets}")
-        
-        # Process selected datasets
-        dataset_iter = process_datasets
-        if tqdm is not None:
-            dataset_iter = tqdm(process_datasets, desc="Converting datasets", unit="dataset")
-        
-        for dataset_name in dataset_iter:
-            if tqdm is None:
-                print(f"Processing dataset: {dataset_name}")
+        logger.debug("Using pyhdf to read %s", hdf_basename)
+        with _open_hdf(hdf_file) as hdf:
+            hdf_ds = hdf[0]
+            
+            # Get projection information from HDF file unless already parsed
+            if projection_info is None:
+                logger.debug("Reading projection info from %s", hdf_basename)
+                projection_info = get_modis_projection_info(hdf_file, hdf)
+            
+            # Get list of datasets
+            all_datasets = list(hdf_ds.datasets())
+            logger.debug("Found %d datasets in %s", len(all_datasets), hdf_basename)
             
-            # Create output filename with parsed date and dataset name
-            if date_str:
-                # Extract product type from filename (MOD13Q1, MOD13A1, etc.)
-                product_type = hdf_basename.split('.')[0]
-                # Create safe filename from dataset name
-                safe_dataset_name = dataset_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                output_filename = f"{product_type}_{date_str}_{safe_dataset_name}.tif"
+            # Determine which datasets to process
+            if wanted is None:
+                # Default: process only NDVI datasets
+                process_datasets = [ds for ds in all_datasets if 'NDVI' in ds]
             else:
-                safe_dataset_name = dataset_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                output_filename = f"{hdf_basename.split('.')[0]}_{hdf_basename.split('.')[1]}_{safe_dataset_name}.tif"
-            output_path = os.path.join(output_dir, output_filename)
+                # Process user-selected datasets
+                process_datasets = [ds for ds in all_datasets if ds in wanted]
             
-            # Force overwrite existing file
-            if os.path.exists(output_path):
-                print(f"Overwriting existing file: {output_path}")
-                os.remove(output_path)
+            logger.debug("Processing %d datasets: %s", len(process_datasets), process_datasets)
             
-            try:
-                # Read dataset
-                dataset = hdf_ds.select(dataset_name)
-                data = dataset.get()
-                
-                # Get attributes
-                attrs = dataset.attributes()
-                
-                # Print dataset info
-                print(f"Dataset shape: {data.shape}")
-                print(f"Dataset type: {data.dtype}")
-                
-                # Create GeoTIFF using GDAL
-                driver = gdal.GetDriverByName('GTiff')
-                if not driver:
-                    print("Error: GTiff driver not available")
-                    continue
-                
-                # Get image size
-                if len(data.shape) == 2:
-                    y_size, x_size = data.shape
-                    num_bands = 1
-                else:
-                    print(f"Error: Unexpected data shape: {data.shape}")
-                    continue
-                
-                # Create output dataset
-                out_ds = driver.Create(output_path, x_size, y_size, num_bands, gdal.GDT_Float32)
-                if not out_ds:
-                    print(f"Error: Cannot create output file: {output_path}")
-                    continue
+            # Subdatasets readable through GDAL's HDF4 driver, empty if unavailable
+            subdatasets = _get_eos_subdatasets(hdf_file, hdf[1].get('StructMetadata.0', ''))
+            
+            # Process selected datasets, with a progress bar only outside worker processes
+            # where parallel bars would garble the shared terminal
+            show_progress = tqdm is not None and multiprocessing.parent_process() is None
+            dataset_iter = process_datasets
+            if show_progress:
+                dataset_iter = tqdm(process_datasets, desc="Converting datasets", unit="dataset")
+            
+            for dataset_name in dataset_iter:
+                if not show_progress:
+                    logger.debug("Processing dataset: %s", dataset_name)
                 
-                # Set geotransform and projection from HDF file
-                if projection_info and projection_info['geotransform']:
-                    geotransform = projection_info['geotransform']
-                    print(f"Using extracted geotransform: {geotransform}")
+                # Create output filename with parsed date, tile and dataset name
+                if date_str:
+                    # Extract product type from filename (MOD13Q1, MOD13A1, etc.)
+                    product_type = hdf_basename.split('.')[0]
+                    # Create safe filename from dataset name
+                    safe_dataset_name = dataset_name.translate(_SAFE_TBL)
+                    output_filename = f"{product_type}_{date_str}{tile_part}_{safe_dataset_name}.tif"
                 else:
-                    print("Error: Could not extract geotransform from HDF file, skipping dataset")
-                    continue
+                    safe_dataset_name = dataset_name.translate(_SAFE_TBL)
+                    output_filename = f"{hdf_basename.split('.')[0]}_{hdf_basename.split('.')[1]}{tile_part}_{safe_dataset_name}.tif"
+                output_path = os.path.join(output_dir, output_filename)
                 
-                out_ds.SetGeoTransform(geotransform)
+                # Force overwrite existing file
+                if os.path.exists(output_path):
+                    logger.debug("Overwriting existing file: %s", output_path)
+                    os.remove(output_path)
                 
-                # Set projection
-                if projection_info['projection_wkt']:
-                    print("Using extracted projection WKT")
+                try:
+                    # Get geotransform from HDF file
+                    if projection_info and projection_info['geotransform']:
+                        geotransform = projection_info['geotransform']
+                        logger.debug("Using extracted geotransform: %s", geotransform)
+                    else:
+                        logger.error("Could not extract geotransform from HDF file, skipping dataset %s", dataset_name)
+                        continue
+                    
+                    # Read dataset
+                    dataset = hdf_ds.select(dataset_name)
+                    
+                    # Get attributes
+                    attrs = dataset.attributes()
+                    
+                    # Let GDAL stream the subdataset straight to GeoTIFF when possible
+                    out_ds = None
+                    if dataset_name in subdatasets:
+                        try:
+                            out_ds = gdal.Translate(output_path, subdatasets[dataset_name], format='GTiff',
+                                                    creationOptions=_GTIFF_CREATION_OPTIONS)
+                        except RuntimeError as e:
+                            # Raised instead of returning None when gdal.UseExceptions() is on
+                            logger.debug("gdal.Translate failed for %s: %s", dataset_name, e)
+                            out_ds = None
+                        if not out_ds:
+                            logger.warning("GDAL could not translate %s, falling back to pyhdf", dataset_name)
+                    
+                    if not out_ds:
+                        _, rank, dims, sds_type, _ = dataset.info()
+                        shape = tuple(dims) if rank > 1 else (dims,)
+                        dtype = np.dtype(_SDC_DTYPES.get(sds_type, 'float32'))
+                        
+                        # Print dataset info
+                        logger.debug("Dataset shape: %s", shape)
+                        logger.debug("Dataset type: %s", dtype)
+                        
+                        # Create GeoTIFF using GDAL
+                        driver = _GTIFF_DRIVER
+                        if not driver:
+                            logger.error("GTiff driver not available")
+                            continue
+                        
+                        # Get image size
+                        if len(shape) == 2:
+                            y_size, x_size = shape
+                            num_bands = 1
+                        else:
+                            logger.error("Unexpected data shape: %s", shape)
+                            continue
+                        
+                        # Keep the native HDF data type (e.g. Int16 for NDVI/EVI, UInt8 for QA)
+                        data_type = gdal_array.NumericTypeCodeToGDALTypeCode(dtype)
+                        if data_type is None:
+                            data_type = gdal.GDT_Float32
+                        
+                        # Create output dataset
+                        out_ds = driver.Create(output_path, x_size, y_size, num_bands, data_type,
+                                               options=_GTIFF_CREATION_OPTIONS)
+                        if not out_ds:
+                            logger.error("Cannot create output file: %s", output_path)
+                            continue
+                        
+                        # Write data in strips of whole GeoTIFF block rows to bound memory use
+                        out_band = out_ds.GetRasterBand(1)
+                        for y_off in range(0, y_size, _STRIP_ROWS):
+                            rows = min(_STRIP_ROWS, y_size - y_off)
+                            strip = dataset.get(start=[y_off, 0], count=[rows, x_size])
+                            out_band.WriteArray(strip, xoff=0, yoff=y_off)
+                    
+                    out_ds.SetGeoTransform(geotransform)
+                    
+                    # Set projection, always present once the geotransform was parsed
+                    logger.debug("Using extracted projection WKT")
                     out_ds.SetProjection(projection_info['projection_wkt'])
-                else:
-                    # Set Sinusoidal projection as fallback
-                    srs = osr.SpatialReference()
-                    srs.ImportFromWkt('PROJCS["unnamed",GEOGCS["Unknown datum based upon the custom spheroid",DATUM["Not specified (based on custom spheroid)",SPHEROID["Custom spheroid",6371007.181,0]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]]],PROJECTION["Sinusoidal"],PARAMETER["longitude_of_center",0],PARAMETER["false_easting",0],PARAMETER["false_northing",0],UNIT["metre",1,AUTHORITY["EPSG","9001"]],AXIS["Easting",EAST],AXIS["Northing",NORTH]]')
-                    out_ds.SetProjection(srs.ExportToWkt())
-                    print("Using default Sinusoidal projection")
-                
-                # Write data
-                out_band = out_ds.GetRasterBand(1)
-                out_band.WriteArray(data)
-                
-                # Set no data value based on dataset type
-                if 'NDVI' in dataset_name or 'EVI' in dataset_name:
-                    out_band.SetNoDataValue(-3000)  # MODIS vegetation indices no data value
-                else:
-                    # For other datasets, try to get no data value from attributes
-                    no_data_value = None
-                    for key, value in attrs.items():
-                        if 'no data' in key.lower() or 'nodata' in key.lower():
-                            no_data_value = value
-                            break
-                    if no_data_value is not None:
-                        out_band.SetNoDataValue(no_data_value)
-                
-                # Copy attributes as metadata
-                metadata = {}
-                for key, value in attrs.items():
-                    metadata[key] = str(value)
-                out_band.SetMetadata(metadata)
-                
-                # Clean up
-                out_ds = None
-                dataset = None
-                
-                print(f"Successfully created GeoTIFF: {output_path}")
-                output_files.append(output_path)
-                
-            except Exception as e:
-                print(f"Error processing dataset {dataset_name}: {str(e)}")
-                continue
-        
-        # Clean up
-        hdf_ds.end()
-        
+                    
+                    # Set no data value based on dataset type
+                    out_band = out_ds.GetRasterBand(1)
+                    if 'NDVI' in dataset_name or 'EVI' in dataset_name:
+                        out_band.SetNoDataValue(-3000)  # MODIS vegetation indices no data value
+                    else:
+                        # For other datasets, use the fill value declared by the SDS
+                        no_data_value = next((attrs[key] for key in _FILL_VALUE_KEYS if key in attrs), None)
+                        if no_data_value is not None:
+                            out_band.SetNoDataValue(no_data_value)
+                    
+                    # Copy attributes as metadata, skipping large array attributes
+                    metadata = {key: str(value) for key, value in attrs.items()
+                                if not isinstance(value, (list, tuple)) or len(value) <= _MAX_METADATA_ITEMS}
+                    out_band.SetMetadata(metadata)
+                    
+                    # Clean up
+                    out_ds = None
+                    dataset = None
+                    
+                    logger.info("Successfully created GeoTIFF: %s", output_path)
+                    output_files.append(output_path)
+                    
+                except Exception as e:
+                    logger.error("Error processing dataset %s: %s", dataset_name, e)
+                    continue
+    
     except Exception as e:
-        print(f"Error processing HDF file: {str(e)}")
+        logger.error("Error processing HDF file: %s", e)
         return []
     
     return output_files
@@ -541,17 +879,21 @@ def hdf_to_geotiff_sinusoidal(hdf_file, output_dir=None, datasets=None):
 
 
 
-def batch_convert_hdf_files(hdf_files, output_dir=None):
+def batch_convert_hdf_files(hdf_files, output_dir=None, max_workers=None):
     """
     Batch convert multiple MODIS HDF files to GeoTIFF format
     
     Args:
         hdf_files (list): List of HDF file paths
         output_dir (str, optional): Output directory for GeoTIFF files
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count
         
     Returns:
         dict: Conversion results
     """
+    # Each file is converted once, never by two workers at the same time
+    hdf_files = list(dict.fromkeys(hdf_files))
+    
     results = {
         'total': len(hdf_files),
         'success': 0,
@@ -577,40 +919,56 @@ def batch_convert_hdf_files(hdf_files, output_dir=None):
     
     # Step 3: Perform conversion based on user selection
     print("\n=== Step 3: Conversion ===")
+    projection_infos = {info['path']: info.get('projection_info') for info in comparison['file_infos']}
+    jobs = []
     if user_selection['all_same']:
         # All files have the same data fields, convert all with same selection
         selected_fields = user_selection['selected_fields']
         for hdf_file in hdf_files:
-            print(f"\nProcessing file: {os.path.basename(hdf_file)}")
-            output_files = hdf_to_geotiff_sinusoidal(hdf_file, output_dir, selected_fields)
-            
-            if output_files:
-                results['success'] += 1
-                results['created_files'].extend(output_files)
-                print(f"Created {len(output_files)} GeoTIFF files")
-            else:
-                results['failed'] += 1
-                print("Conversion failed")
+            jobs.append((hdf_file, selected_fields))
     else:
         # Files have different data fields, convert each with its own selection
         selections = user_selection['selections']
         for hdf_file in hdf_files:
             if hdf_file in selections:
-                selected_fields = selections[hdf_file]
-                print(f"\nProcessing file: {os.path.basename(hdf_file)}")
-                output_files = hdf_to_geotiff_sinusoidal(hdf_file, output_dir, selected_fields)
-                
-                if output_files:
-                    results['success'] += 1
-                    results['created_files'].extend(output_files)
-                    print(f"Created {len(output_files)} GeoTIFF files")
-                else:
-                    results['failed'] += 1
-                    print("Conversion failed")
+                jobs.append((hdf_file, selections[hdf_file]))
             else:
                 print(f"Skipping file: {os.path.basename(hdf_file)} (no selection)")
                 results['failed'] += 1
     
+    if not jobs:
+        return results
+    
+    # Files are independent, so convert them in parallel worker processes
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if os.name == 'nt':
+        max_workers = min(max_workers, _MAX_WINDOWS_WORKERS)
+    max_workers = max(1, min(max_workers, len(jobs)))
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(hdf_to_geotiff_sinusoidal, hdf_file, output_dir, selected_fields,
+                            projection_infos.get(hdf_file)): hdf_file
+            for hdf_file, selected_fields in jobs
+        }
+        
+        for future in as_completed(futures):
+            hdf_file = futures[future]
+            try:
+                output_files = future.result()
+            except Exception as e:
+                print(f"Error processing file {os.path.basename(hdf_file)}: {e}")
+                output_files = []
+            
+            if output_files:
+                results['success'] += 1
+                results['created_files'].extend(output_files)
+                print(f"{os.path.basename(hdf_file)}: created {len(output_files)} GeoTIFF files")
+            else:
+                results['failed'] += 1
+                print(f"{os.path.basename(hdf_file)}: conversion failed")
+    
     return results
 
 
@@ -693,7 +1051,7 @@ def convert_with_user_selection(hdf_file, output_dir=None, interactive=True):
     
     # Step 4: Perform conversion
     print("\n=== Step 3: Conversion ===")
-    output_files = hdf_to_geotiff_sinusoidal(hdf_file, output_dir, selected_fields)
+    output_files = hdf_to_geotiff_sinusoidal(hdf_file, output_dir, selected_fields, file_info.get('projection_info'))
     
     if output_files:
         return {
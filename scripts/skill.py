@@ -4,29 +4,86 @@
 HDF to GeoTIFF converter skill
 """
 
+import json
+import logging
 import os
+import re
 import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from converter import analyze_hdf_file, hdf_to_geotiff_sinusoidal
 
+logger = logging.getLogger(__name__)
+
+# Parameters accepted in string input to run_skill
+_PARAM_KEYS = ('input_file', 'output_dir')
+_PARAM_KEY_PATTERN = r'\b(?:' + '|'.join(_PARAM_KEYS) + r')\s*[:=]'
+
+# key=value / key: value anywhere in the text. A value is quoted when its closing
+# quote ends it; otherwise it runs to the next comma, newline or parameter key, so
+# unquoted paths may contain spaces and apostrophes
+_PARAM_RE = re.compile(
+    r'\b(' + '|'.join(_PARAM_KEYS) + r')\s*[:=][ \t]*'
+    r'(?:(["\'])([^\r\n]*?)\2(?=[ \t]*(?:,|$|' + _PARAM_KEY_PATTERN + r'))'
+    r'|((?:(?!\s*' + _PARAM_KEY_PATTERN + r')[^,\r\n])*))',
+    re.M
+)
+
+
+class NpEncoder(json.JSONEncoder):
+    """JSON encoder that converts numpy types to Python native types while serializing"""
+    
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        return super().default(obj)
+
+
+def _parse_key_values(text):
+    """
+    Parse input_file / output_dir parameters from free text in one regex pass
+    
+    Keys may appear anywhere, e.g. 'Please convert input_file=D:/my data/a.hdf'.
+    A later occurrence of a key overrides an earlier one.
+    
+    Args:
+        text (str): Input string, e.g. 'input_file="D:/data/a.hdf", output_dir=D:/out'
+    
+    Returns:
+        dict: Parameter values by key
+    """
+    params = {}
+    for match in _PARAM_RE.finditer(text):
+        quoted, unquoted = match.group(3), match.group(4)
+        params[match.group(1)] = quoted if quoted is not None else unquoted.strip()
+    return params
+
 
-def analyze(input_file):
+def analyze(input_file, _analyze=analyze_hdf_file):
     """
     Analyze HDF file and return available datasets
     
     Args:
         input_file (str): Path to HDF file
+        _analyze: Bound as a default so the call is a local lookup, not meant to be passed
     
     Returns:
         dict: Analysis result with file info and available datasets
     """
     try:
-        if not os.path.exists(input_file):
-            return {
-                "status": "error",
-                "message": f"File not found: {input_file}"
-            }
-        
-        file_info = analyze_hdf_file(input_file)
+        file_info = _analyze(input_file)
         
         return {
             "status": "success",
@@ -34,7 +91,12 @@ def analyze(input_file):
             "message": f"Found {len(file_info.get('data_fields', []))} datasets"
         }
     except Exception as e:
-        import traceback
+        # Only a missing input file is reported as such, not e.g. a missing output path
+        if isinstance(e, FileNotFoundError) and e.filename == input_file:
+            return {
+                "status": "error",
+                "message": f"File not found: {input_file}"
+            }
         traceback.print_exc()
         return {
             "status": "error",
@@ -42,28 +104,22 @@ def analyze(input_file):
         }
 
 
-def convert(input_file, output_dir, datasets=None):
+def _convert_one(input_file, output_dir, datasets=None, _hdf2geo=hdf_to_geotiff_sinusoidal):
     """
-    Convert HDF file to GeoTIFF
+    Convert one HDF file to GeoTIFF, kept at module level so worker processes can run it
     
     Args:
         input_file (str): Path to HDF file
         output_dir (str): Output directory
         datasets (list, optional): List of dataset names to convert
+        _hdf2geo: Bound as a default so the call is a local lookup, not meant to be passed
     
     Returns:
         dict: Conversion result
     """
     try:
-        if not os.path.exists(input_file):
-            return {
-                "status": "error",
-                "message": f"File not found: {input_file}"
-            }
-        
-        os.makedirs(output_dir, exist_ok=True)
-        
-        output_files = hdf_to_geotiff_sinusoidal(input_file, output_dir, datasets)
+        # The converter creates output_dir itself
+        output_files = _hdf2geo(input_file, output_dir, datasets)
         
         if output_files:
             return {
@@ -77,7 +133,12 @@ def convert(input_file, output_dir, datasets=None):
                 "message": "No files were converted"
             }
     except Exception as e:
-        import traceback
+        # Only a missing input file is reported as such, not e.g. a missing output path
+        if isinstance(e, FileNotFoundError) and e.filename == input_file:
+            return {
+                "status": "error",
+                "message": f"File not found: {input_file}"
+            }
         traceback.print_exc()
         return {
             "status": "error",
@@ -85,6 +146,95 @@ def convert(input_file, output_dir, datasets=None):
         }
 
 
+def convert(input_file, output_dir, datasets=None):
+    """
+    Convert HDF file to GeoTIFF
+    
+    Args:
+        input_file (str): Path to HDF file
+        output_dir (str): Output directory
+        datasets (list, optional): List of dataset names to convert
+    
+    Returns:
+        dict: Conversion result
+    """
+    return _convert_one(input_file, output_dir, datasets)
+
+
+def convert_many(input_files, output_dir=None, datasets=None, max_workers=None):
+    """
+    Convert multiple HDF files to GeoTIFF in parallel worker processes
+    
+    Args:
+        input_files (list): Paths to HDF files, duplicates are converted once
+        output_dir (str, optional): Output directory. Defaults to each file's directory
+        datasets (list, optional): List of dataset names to convert
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count
+    
+    Returns:
+        dict: Conversion result with per-file results
+    """
+    if not isinstance(input_files, (list, tuple)) or not all(isinstance(f, str) for f in input_files):
+        return {
+            "status": "error",
+            "message": "input_files must be a list of file paths"
+        }
+    
+    # Each file is converted once; the converter names outputs by tile, so
+    # different tiles sharing output_dir never write the same GeoTIFF
+    input_files = list(dict.fromkeys(input_files))
+    
+    if not input_files:
+        return {
+            "status": "error",
+            "message": "No input files provided"
+        }
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(input_files))
+    
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_convert_one, input_file, output_dir or os.path.dirname(input_file), datasets): input_file
+                for input_file in input_files
+            }
+            for future in as_completed(futures):
+                input_file = futures[future]
+                try:
+                    results[input_file] = future.result()
+                except Exception as e:
+                    results[input_file] = {
+                        "status": "error",
+                        "message": f"Conversion failed: {str(e)}"
+                    }
+    except Exception as e:
+        # Pool creation can fail before any file runs, e.g. max_workers > 61 on Windows
+        traceback.print_exc()
+        return {
+            "status": "error",
+            "message": f"Conversion failed: {str(e)}"
+        }
+    
+    # Report files in the order they were requested
+    output_files = []
+    succeeded = 0
+    for input_file in input_files:
+        result = results[input_file]
+        if result['status'] == 'success':
+            succeeded += 1
+            output_files.extend(result['output_files'])
+    
+    return {
+        "status": "success" if succeeded == len(input_files) else "error",
+        "message": f"Successfully converted {succeeded} of {len(input_files)} file(s)",
+        "output_files": output_files,
+        "results": results
+    }
+
+
 def handle_hdf_to_geotiff_conversion(request):
     """
     Handle HDF to GeoTIFF conversion request
@@ -92,6 +242,7 @@ def handle_hdf_to_geotiff_conversion(request):
     Args:
         request (dict): Request dictionary containing conversion parameters
             - input_file: Input HDF file path
+            - input_files: (optional) List of input HDF file paths, converted in parallel
             - output_dir: Output directory for GeoTIFF files
             - datasets: (optional) List of dataset names to convert
             - analyze_only: (optional) If True, only analyze without converting
@@ -99,34 +250,33 @@ def handle_hdf_to_geotiff_conversion(request):
     Returns:
         dict: Conversion result
     """
-    try:
-        input_file = request.get('input_file')
-        output_dir = request.get('output_dir')
-        datasets = request.get('datasets')
-        analyze_only = request.get('analyze_only', False)
-        
-        if not input_file:
+    input_file = request.get('input_file')
+    output_dir = request.get('output_dir')
+    datasets = request.get('datasets')
+    input_files = request.get('input_files')
+    analyze_only = request.get('analyze_only', False)
+    
+    if input_files:
+        if analyze_only:
             return {
                 "status": "error",
-                "message": "Missing required parameter: input_file"
+                "message": "analyze_only is not supported with input_files, analyze one input_file at a time"
             }
-        
-        if analyze_only:
-            return analyze(input_file)
-        
-        if not output_dir:
-            output_dir = os.path.dirname(input_file)
-        
-        return convert(input_file, output_dir, datasets)
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        return convert_many(input_files, output_dir, datasets)
+    
+    if not input_file:
         return {
             "status": "error",
-            "message": f"Conversion failed: {str(e)}"
+            "message": "Missing required parameter: input_file"
         }
+    
+    if analyze_only:
+        return analyze(input_file)
+    
+    if not output_dir:
+        output_dir = os.path.dirname(input_file)
+    
+    return convert(input_file, output_dir, datasets)
 
 
 def run_skill(input_data):
@@ -134,60 +284,69 @@ def run_skill(input_data):
     Skill main entry function
     
     Args:
-        input_data (dict): Input data
+        input_data (dict or str): Input data as a dictionary, a JSON object string,
+            a key=value string or a directory containing HDF files
     
     Returns:
         dict: Processing result
     """
-    print("=====================================")
-    print("     HDF to GeoTIFF Converter Skill")
-    print("=====================================")
+    # Report through logging so batch callers pay nothing unless INFO is enabled
+    report = logger.isEnabledFor(logging.INFO)
+    if report:
+        logger.info("=====================================\n"
+                    "     HDF to GeoTIFF Converter Skill\n"
+                    "=====================================")
     
     # Handle different input formats
     if isinstance(input_data, dict):
         # Directly handle dictionary input
-        print("Processing dictionary input...")
+        logger.debug("Processing dictionary input...")
         result = handle_hdf_to_geotiff_conversion(input_data)
     elif isinstance(input_data, str):
         # Handle string input
-        print("Processing string input...")
-        # Try to parse parameters from string
-        import re
-        input_file_match = re.search(r'input_file\s*[:=]\s*("[^"]+"|\'[^\']+\'|[^,\n]+)', input_data)
-        output_dir_match = re.search(r'output_dir\s*[:=]\s*("[^"]+"|\'[^\']+\'|[^,\n]+)', input_data)
+        logger.debug("Processing string input...")
+        request = None
         
-        input_file = None
-        output_dir = None
+        if input_data.lstrip().startswith('{'):
+            # JSON object input carries the same keys as dictionary input
+            try:
+                request = json.loads(input_data)
+            except ValueError:
+                request = None
         
-        if input_file_match:
-            input_file = input_file_match.group(1).strip('"\'')
-        else:
-            # Try to extract file path from string
-            import glob
-            hdf_files = glob.glob(os.path.join(input_data, '*.hdf'))
-            if hdf_files:
-                input_file = hdf_files[0]
-        
-        if output_dir_match:
-            output_dir = output_dir_match.group(1).strip('"\'')
+        if not isinstance(request, dict):
+            input_file = None
+            output_dir = None
+            
+            if os.path.isdir(input_data):
+                # Use the first HDF file found in the directory
+                with os.scandir(input_data) as entries:
+                    input_file = next((entry.path for entry in entries if entry.name.lower().endswith('.hdf')), None)
+            elif '=' in input_data or ':' in input_data:
+                # Try to parse key=value / key: value parameters from string
+                params = _parse_key_values(input_data)
+                input_file = params.get('input_file')
+                output_dir = params.get('output_dir')
+            
+            request = {
+                'input_file': input_file,
+                'output_dir': output_dir
+            }
         
-        result = handle_hdf_to_geotiff_conversion({
-            'input_file': input_file,
-            'output_dir': output_dir
-        })
+        result = handle_hdf_to_geotiff_conversion(request)
     else:
         result = {
             "status": "error",
             "message": "Invalid input format, should be dictionary or string"
         }
     
-    print(f"\nResult: {result['status']}")
-    print(f"Message: {result['message']}")
-    if 'output_files' in result and result['output_files']:
-        print("\nCreated files:")
-        for file in result['output_files']:
-            print(f"- {os.path.basename(file)}")
-    print("=====================================")
+    if report:
+        lines = [f"\nResult: {result['status']}", f"Message: {result['message']}"]
+        if 'output_files' in result and result['output_files']:
+            lines.append("\nCreated files:")
+            lines.extend(f"- {os.path.basename(file)}" for file in result['output_files'])
+        lines.append("=====================================")
+        logger.info('\n'.join(lines))
     
     return result
 
@@ -197,36 +356,24 @@ if __name__ == "__main__":
     Main function - accepts command line arguments
     
     Usage:
-        python skill.py analyze <input_file>
-        python skill.py convert <input_file> <output_dir> <datasets>
+        python skill.py analyze <input_file> [--verbose]
+        python skill.py convert <input_file> <output_dir> <datasets> [--verbose]
     
     Example:
         python skill.py analyze D:/ndvi/hdf/MOD13Q1.A2023161.h29v09.061.hdf
         python skill.py convert D:/ndvi/hdf/MOD13Q1.A2023161.h29v09.061.hdf D:/ndvi/tif "NDVI,EVI"
     """
-    import json
-    import sys
-    import numpy as np
-    from osgeo import gdal
-    
-    def convert_to_serializable(obj):
-        """Convert numpy types to Python native types for JSON serialization"""
-        if isinstance(obj, dict):
-            return {k: convert_to_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_to_serializable(v) for v in obj]
-        elif isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return obj
+    
+    # --verbose shows per-dataset conversion details from the converter
+    verbose = '--verbose' in sys.argv
+    if verbose:
+        sys.argv.remove('--verbose')
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO, format='%(message)s')
     
     if len(sys.argv) < 3:
         print("Usage:")
-        print("  python skill.py analyze <input_file>")
-        print("  python skill.py convert <input_file> <output_dir> [datasets]")
+        print("  python skill.py analyze <input_file> [--verbose]")
+        print("  python skill.py convert <input_file> <output_dir> [datasets] [--verbose]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -262,8 +409,13 @@ if __name__ == "__main__":
             'output_dir': output_dir,
             'datasets': datasets
         })
-        result = convert_to_serializable(result)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        if orjson is not None:
+            # orjson serializes numpy types natively and returns UTF-8 bytes
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b'\n')
+            sys.stdout.buffer.flush()
+        else:
+            sys.stdout.write(json.dumps(result, indent=2, ensure_ascii=False, cls=NpEncoder) + '\n')
     
     else:
         print(f"Unknown command: {command}")